@@ -1,12 +1,14 @@
 debug = True
 
-server_docker_file = "server_docker_file"
-client_docker_file = "client_docker_file"
-
 server_container_working_dir = "/codequest"
 client_container_working_dir = "/codequest"
 
-check_game_has_finished_interval = 10  # Wait this many seconds before checking again
+docker_client_timeout = 120  # In seconds
+# Images are built and containers started in parallel, so the client needs more than the default of 10 connections
+docker_client_max_pool_size = 32
+
+write_logs_timeout = 30  # How long to wait for the logs of a stopped container to be written (in seconds)
+
 end_game_keyword = (
     "END"  # The game sends this to its sidecar or server sidecar sends it to the client
 )
@@ -1,14 +1,19 @@
 import argparse
+import hashlib
+import io
 import json
 import logging
 import os
 import secrets
 import shutil
 import sys
-import time
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import docker
-from docker.errors import APIError, ImageNotFound, NotFound
+from docker.errors import APIError, BuildError, ImageNotFound, NotFound
 from docker.models.containers import Container
 from docker.models.networks import Network
 
@@ -19,6 +24,35 @@ logger.addHandler(logging.StreamHandler(sys.stdout))
 logger.setLevel(logging.INFO)
 log = logger.info
 
+_docker_client = None
+
+# Copies the sidecar files on top of the given image
+_SIDECAR_BASE_DOCKERFILE_TEMPLATE = (
+    "FROM {image}\nCOPY {sidecar_files} {working_dir}/\n"
+)
+
+# Runs the program alongside its sidecar
+_GAME_DOCKERFILE_TEMPLATE = (
+    "FROM {base_image}\n"
+    'ENTRYPOINT ["/bin/sh", "-c", "echo STARTED-{game_secret} && '
+    "socat {socat_flags} "
+    "EXEC:'python {sidecar} {sidecar_args}' "
+    '{program_exe}"]\n'
+)
+
+
+def get_docker_client():
+    """
+    Returns the Docker client shared between games, so its connection pool is reused instead of set up every game.
+    """
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = docker.from_env(
+            timeout=config.docker_client_timeout,
+            max_pool_size=config.docker_client_max_pool_size,
+        )
+    return _docker_client
+
 
 def create_network(docker_client, game_secret):
     network_name = f"cq_network_{game_secret}"
@@ -36,19 +70,142 @@ def ensure_empty_volume_exists(docker_client, volume_name):
 
 
 def ensure_empty_folder_exists(folder_full_path):
-    if not os.path.exists(folder_full_path):
-        # Create the folder if it doesn't exist
-        os.makedirs(folder_full_path)
-    else:
-        # Clear the contents of the folder
-        for file_name in os.listdir(folder_full_path):
-            file_path = os.path.join(folder_full_path, file_name)
-            if os.path.isfile(file_path):
+    # Create the folder if it doesn't exist
+    os.makedirs(folder_full_path, exist_ok=True)
+
+    # Clear the contents of the folder, scandir gives us the file types without an extra stat per entry
+    with os.scandir(folder_full_path) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
                 # Delete the file
-                os.remove(file_path)
-            elif os.path.isdir(file_path):
+                os.remove(entry.path)
+            elif entry.is_dir(follow_symlinks=False):
                 # Delete the subdirectory and its contents
-                shutil.rmtree(file_path)
+                shutil.rmtree(entry.path)
+
+
+def build_image(docker_client, image_name, **kwargs):
+    """
+    Builds an image through the low level API and returns its ID.
+    In debug mode the build output is logged as it arrives. The image ID is taken straight from the build output
+    instead of inspecting the image afterwards.
+    :param kwargs: Passed to the build API as they are, e.g. the build context
+    """
+    build_log = []
+    image_id = None
+    for chunk in docker_client.api.build(
+        tag=image_name, rm=True, forcerm=True, decode=True, **kwargs
+    ):
+        build_log.append(chunk)
+        if config.debug and "stream" in chunk:
+            log(f"[{image_name}] {chunk['stream'].rstrip()}")
+        if "error" in chunk:
+            raise BuildError(chunk["error"], build_log)
+        if "ID" in chunk.get("aux", {}):
+            image_id = chunk["aux"]["ID"]
+
+    if image_id is None:
+        raise BuildError(f"No image ID in the build output of {image_name}", build_log)
+    return image_id
+
+
+def build_sidecar_base_image(docker_client, image, sidecar_file, working_dir, role):
+    """
+    Builds the given image with the sidecar and config files copied in, and returns its tag.
+    The tag only depends on the image and the sidecar files, so repeat games reuse the cached image and only
+    have to build the per-game entrypoint on top of it.
+    """
+    sidecar_files = ["config.py", sidecar_file]
+    if config.debug:
+        sidecar_files.append("sidecar_debugger_inside.py")
+
+    digest = hashlib.sha1(image.encode("utf-8"))
+    try:
+        # A tag might be moved to a new image between games, so the ID has to be part of the hash too
+        digest.update(docker_client.images.get(image).id.encode("utf-8"))
+    except ImageNotFound:
+        # The build will pull it
+        pass
+    for file_name in sidecar_files:
+        digest.update(f"{file_name}:{os.path.getmtime(file_name)}".encode("utf-8"))
+    base_image_name = f"cq_{role}_base:{digest.hexdigest()[:12]}"
+
+    try:
+        # Already built by a previous game, no need to send the build context to the daemon again
+        docker_client.images.get(base_image_name)
+        return base_image_name
+    except ImageNotFound:
+        pass
+
+    # Only send the files the image needs as the build context, not the whole working directory
+    sidecar_file_contents = {}
+    for file_name in sidecar_files:
+        with open(file_name) as f:
+            sidecar_file_contents[file_name] = f.read()
+
+    # Put the sidecar and config file in, in a single layer. COPY creates the working directory itself.
+    docker_file = _SIDECAR_BASE_DOCKERFILE_TEMPLATE.format(
+        image=image,
+        sidecar_files=" ".join(sidecar_files),
+        working_dir=working_dir,
+    )
+    build_image_from_memory(
+        docker_client,
+        base_image_name,
+        docker_file,
+        files=sidecar_file_contents,
+    )
+
+    return base_image_name
+
+
+def create_archive(files):
+    """
+    Creates an in memory tar archive
+    :param files: Dict of file names to their contents
+    """
+    archive_file = io.BytesIO()
+    with tarfile.open(fileobj=archive_file, mode="w") as archive:
+        for file_name, content in files.items():
+            data = content.encode("utf-8")
+            file_info = tarfile.TarInfo(file_name)
+            file_info.size = len(data)
+            archive.addfile(file_info, io.BytesIO(data))
+    archive_file.seek(0)
+    return archive_file
+
+
+def build_image_from_memory(
+    docker_client, image_name, docker_file, files=None, **kwargs
+):
+    """
+    Builds an image from a build context that only exists in memory, so nothing has to be written on the host.
+    Returns the ID of the image.
+    :param docker_file: Contents of the Dockerfile
+    :param files: Dict of file names to their contents, to be put in the build context next to the Dockerfile
+    """
+    context = create_archive({"Dockerfile": docker_file, **(files or {})})
+
+    return build_image(
+        docker_client, image_name, fileobj=context, custom_context=True, **kwargs
+    )
+
+
+def create_game_docker_file(
+    base_image_name, game_secret, sidecar, sidecar_args, program_exe
+):
+    """
+    Returns the Dockerfile of the per-game image, which runs the program alongside its sidecar.
+    """
+    return _GAME_DOCKERFILE_TEMPLATE.format(
+        base_image=base_image_name,
+        game_secret=game_secret,
+        # Verbose socat logs every byte going through the sidecar, only worth it when debugging
+        socat_flags="-v" if config.debug else "",
+        sidecar=sidecar,
+        sidecar_args=sidecar_args,
+        program_exe=program_exe,
+    )
 
 
 def start_server(
@@ -59,54 +216,43 @@ def start_server(
     server_args=tuple(),
     sidecar_args=tuple(),
 ):
-    with open(config.server_docker_file, "w") as f:
-        f.write(f"FROM {server_image}\n")
-        # Make sure the working directory exists
-        f.write(f"RUN mkdir -p {config.server_container_working_dir}\n")
-        # Put the sidecar and config file in
-        f.write(f"COPY config.py {config.server_container_working_dir}\n")
-        f.write(f"COPY server_sidecar.py {config.server_container_working_dir}\n")
-
-        if config.debug:
-            f.write(
-                f"COPY sidecar_debugger_inside.py {config.server_container_working_dir}\n"
-            )
-
-        server_args = " ".join(list(server_args))
-        sidecar_args = " ".join([game_secret] + list(sidecar_args))
+    base_image_name = build_sidecar_base_image(
+        docker_client,
+        server_image,
+        "server_sidecar.py",
+        config.server_container_working_dir,
+        "server",
+    )
 
-        # If it's debug, connect the sidecar to IO directly
-        if config.debug:
-            program_exe = f"EXEC:'python {config.server_container_working_dir}/sidecar_debugger_inside.py 6000'"
-        else:
-            program_exe = (
-                f"EXEC:'sh {config.server_container_working_dir}/run.sh {server_args}'"
-            )
+    server_args = " ".join(list(server_args))
+    sidecar_args = " ".join([game_secret] + list(sidecar_args))
 
-        # Run the server alongside the sidecar
-        f.write(
-            f'ENTRYPOINT ["/bin/sh", "-c", "echo STARTED-{game_secret} && '
-            f"socat -v "
-            f"EXEC:'python {config.server_container_working_dir}/server_sidecar.py {sidecar_args}' "
-            f'{program_exe}"]\n'
+    # If it's debug, connect the sidecar to IO directly
+    if config.debug:
+        program_exe = f"EXEC:'python {config.server_container_working_dir}/sidecar_debugger_inside.py 6000'"
+    else:
+        program_exe = (
+            f"EXEC:'sh {config.server_container_working_dir}/run.sh {server_args}'"
         )
 
+    docker_file = create_game_docker_file(
+        base_image_name,
+        game_secret,
+        f"{config.server_container_working_dir}/server_sidecar.py",
+        sidecar_args,
+        program_exe,
+    )
+
     # Build the image
     server_image_name = f"cq_server_image_{game_secret}"
-    server_image_object = docker_client.images.build(
-        path=".",
-        dockerfile=config.server_docker_file,
-        rm=True,
-        forcerm=True,
-        tag=server_image_name,
-    )[0]
-
-    # Remove the temp files
-    os.remove("server_docker_file")
+    server_image_id = build_image_from_memory(
+        docker_client,
+        server_image_name,
+        docker_file,
+    )
 
     ensure_empty_volume_exists(docker_client, "cq-game-replay")
-    live_replay_folder = os.path.join(os.getcwd(), "live_replay_files")
-    ensure_empty_folder_exists(live_replay_folder)
+    ensure_empty_volume_exists(docker_client, "cq-game-live-replay")
 
     return (
         docker_client.containers.run(
@@ -119,10 +265,13 @@ def start_server(
             detach=True,
             volumes={
                 "cq-game-replay": {"bind": "/codequest/replay", "mode": "rw"},
-                live_replay_folder: {"bind": "/codequest/live-replay", "mode": "rw"},
+                "cq-game-live-replay": {
+                    "bind": "/codequest/live-replay",
+                    "mode": "rw",
+                },
             },
         ),
-        server_image_object,
+        server_image_id,
     )
 
 
@@ -134,112 +283,209 @@ def send_game_started_signal_to_server(server_container: Container):
     )
 
 
+def build_client_image(docker_client, image, game_secret, client_args=tuple()):
+    """
+    Builds the client image for this game, on top of the given image. Clients using the same image share this image
+    since everything that differs between them is put in their containers when starting them.
+    Returns the name and the ID of the image.
+    """
+    base_image_name = build_sidecar_base_image(
+        docker_client,
+        image,
+        "client_sidecar.py",
+        config.client_container_working_dir,
+        "client",
+    )
+
+    client_args = " ".join(list(client_args))
+
+    # If it's debug, connect the sidecar to IO directly
+    if config.debug:
+        program_exe = f"EXEC:'python {config.server_container_working_dir}/sidecar_debugger_inside.py 6000'"
+    else:
+        program_exe = (
+            f"EXEC:'sh {config.client_container_working_dir}/run.sh {client_args}'"
+        )
+
+    docker_file = create_game_docker_file(
+        base_image_name,
+        game_secret,
+        f"{config.client_container_working_dir}/client_sidecar.py",
+        f"{config.client_container_working_dir}/sidecar_args",
+        program_exe,
+    )
+
+    # Build the image
+    image_hash = hashlib.sha1(image.encode("utf-8")).hexdigest()[:12]
+    client_image_name = f"cq_client_image_{image_hash}_{game_secret}"
+    client_image_id = build_image_from_memory(
+        docker_client,
+        client_image_name,
+        docker_file,
+    )
+
+    return client_image_name, client_image_id
+
+
 def start_client(
     docker_client,
     network_name,
     client_index,
     client,
+    client_image_name,
     game_secret,
-    client_args=tuple(),
     sidecar_args=tuple(),
 ):
-    with open(config.client_docker_file, "w") as docker_file:
-        docker_file.write(f"FROM {client['image']}\n")
-        # Make sure the working directory exists
-        docker_file.write(f"RUN mkdir -p {config.client_container_working_dir}\n")
-        # Put the sidecar and the config file in
-        docker_file.write(f"COPY config.py {config.client_container_working_dir}\n")
-        docker_file.write(
-            f"COPY client_sidecar.py {config.client_container_working_dir}\n"
-        )
+    client_container = docker_client.containers.create(
+        client_image_name,
+        name=f"cq_client_{str(client_index)}_{game_secret}",
+        network=network_name,
+        auto_remove=False,
+        ports={6000: 6001 + client_index} if config.debug else None,
+        mem_limit=config.client_memory_limit,
+    )
 
-        if config.debug:
-            docker_file.write(
-                f"COPY sidecar_debugger_inside.py {config.client_container_working_dir}\n"
-            )
+    # Sidecar args might have weird stuff in them, we have to put them in a file inside the container
+    sidecar_args = "\n".join(
+        [game_secret, client["id"], client["name"]] + list(sidecar_args)
+    )
+    client_container.put_archive(
+        config.client_container_working_dir,
+        create_archive({"sidecar_args": sidecar_args}),
+    )
 
-        client_args = " ".join(list(client_args))
+    client_container.start()
+    return client_container
 
-        # Sidecar args might have weird stuff in them, we have to write in a file then put the file inside image
-        sidecar_args = "\n".join(
-            [game_secret, client["id"], client["name"]] + list(sidecar_args)
-        )
-        with open("_temp_sidecar_args_file", "w") as temp_file:
-            temp_file.write(sidecar_args)
-        sidecar_args_file = f"{config.client_container_working_dir}/sidecar_args"
-        docker_file.write(f"COPY _temp_sidecar_args_file {sidecar_args_file}\n")
-
-        # If it's debug, connect the sidecar to IO directly
-        if config.debug:
-            program_exe = f"EXEC:'python {config.server_container_working_dir}/sidecar_debugger_inside.py 6000'"
-        else:
-            program_exe = (
-                f"EXEC:'sh {config.client_container_working_dir}/run.sh {client_args}'"
-            )
 
-        # Run the client alongside the sidecar
-        docker_file.write(
-            f'ENTRYPOINT ["/bin/sh", "-c", "echo STARTED-{game_secret} && '
-            f"socat -v "
-            f"EXEC:'python {config.client_container_working_dir}/client_sidecar.py {sidecar_args_file}' "
-            f'{program_exe}"]\n'
-        )
+def is_safe_archive_member(member: tarfile.TarInfo, folder_full_path):
+    """
+    Only plain files and folders that end up inside the given folder are safe to extract.
+    """
+    if not (member.isfile() or member.isdir()):
+        log(f"Skipping a link or special file in the archive: {member.name}")
+        return False
 
-    # Build the image
-    client_image_name = f"cq_client_image_{client['id']}_{game_secret}"
-    client_image_object = docker_client.images.build(
-        path=".",
-        dockerfile=config.client_docker_file,
-        rm=True,
-        forcerm=True,
-        tag=client_image_name,
-    )[0]
-
-    # Remove the temp files
-    os.remove("_temp_sidecar_args_file")
-    os.remove("client_docker_file")
+    folder_full_path = os.path.realpath(folder_full_path)
+    member_path = os.path.realpath(os.path.join(folder_full_path, member.name))
+    if os.path.commonpath([folder_full_path, member_path]) != folder_full_path:
+        log(f"Skipping a file outside of the folder in the archive: {member.name}")
+        return False
 
-    return (
-        docker_client.containers.run(
-            client_image_name,
-            name=f"cq_client_{str(client_index)}_{game_secret}",
-            network=network_name,
-            auto_remove=False,
-            detach=True,
-            ports={6000: 6001 + client_index} if config.debug else None,
-            mem_limit=config.client_memory_limit,
-        ),
-        client_image_object,
-    )
+    return True
 
 
-def write_logs_and_remove_containers(folder_path, *containers):
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
-    else:
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-
-    for container in containers:
-        with open(os.path.join(folder_path, container.name), "w") as f:
-            try:
-                f.write(container.logs().decode("utf-8"))
-            except APIError as e:
-                log(f"Failed to save container logs: {container.name}")
-                log(repr(e))
+def copy_live_replay_files(server_container: Container, folder_full_path):
+    """
+    Copies the live replay files out of the server container in one go.
+    The server writes them to a volume during the game, which is a lot cheaper than writing through a bind mount.
+    """
+    ensure_empty_folder_exists(folder_full_path)
+
+    stream, _ = server_container.get_archive("/codequest/live-replay")
+    with tempfile.TemporaryFile() as archive_file:
+        for chunk in stream:
+            archive_file.write(chunk)
+        archive_file.seek(0)
+
+        with tarfile.open(fileobj=archive_file) as archive:
+            # Everything is inside a "live-replay" folder in the archive, put its contents directly in the folder
+            members = []
+            for member in archive.getmembers():
+                _, _, member.name = member.name.partition("/")
+                if member.name:
+                    members.append(member)
+            # The archive comes from the container, so don't let it write anything outside the folder
+            if hasattr(tarfile, "data_filter"):
+                archive.extractall(folder_full_path, members=members, filter="data")
+            else:
+                # Extraction filters are missing before Python 3.10.12 and 3.11.4, check the members ourselves
+                archive.extractall(
+                    folder_full_path,
+                    members=[
+                        member
+                        for member in members
+                        if is_safe_archive_member(member, folder_full_path)
+                    ],
+                )
+
+
+def start_writing_logs(folder_path, container: Container):
+    """
+    Writes the logs of the container to a file in the given folder as they come, during the game.
+    Returns the thread doing it, which finishes when the container stops.
+    """
+
+    def write_logs():
         try:
-            container.remove(force=True)
+            with open(os.path.join(folder_path, container.name), "wb") as f:
+                for chunk in container.logs(stream=True, follow=True):
+                    f.write(chunk)
+        except Exception as e:
+            # Saving the logs is best effort, e.g. the container might be removed while still streaming
+            log(f"Failed to save container logs: {container.name}")
+            log(repr(e))
+
+    log_thread = threading.Thread(target=write_logs, daemon=True)
+    log_thread.start()
+    return log_thread
+
+
+def stop_and_remove_containers(*containers_and_log_threads):
+    """
+    Stops and removes the containers after their logs are written.
+    :param containers_and_log_threads: Tuples of containers and their threads from start_writing_logs
+    """
+
+    def stop_and_remove_container(container, log_thread):
+        try:
+            # The log stream only ends when the container stops, clients might still be running at this point
+            container.stop(timeout=0)
+        except APIError as e:
+            log(f"Failed to stop the container: {container.name}")
+            log(repr(e))
+
+        log_thread.join(timeout=config.write_logs_timeout)
+        if log_thread.is_alive():
+            log(f"Timed out while saving container logs: {container.name}")
+
+        try:
+            container.remove(force=True, v=True)
         except APIError as e:
             log(f"Failed to remove the container: {container.name}")
             log(repr(e))
 
+    with ThreadPoolExecutor(
+        max_workers=max(len(containers_and_log_threads), 1)
+    ) as executor:
+        futures = [
+            executor.submit(stop_and_remove_container, container, log_thread)
+            for container, log_thread in containers_and_log_threads
+        ]
+        for future in futures:
+            future.result()
 
-def remove_images(docker_client, *images):
-    for image in images:
+
+def pull_missing_images(docker_client, *images):
+    """
+    Pulls the images that are not available on the host in parallel, so the builds don't pull them one by one.
+    """
+
+    def pull_if_missing(image):
         try:
-            docker_client.images.remove(image.id, force=True)
+            docker_client.images.get(image)
+        except ImageNotFound:
+            log(f"Pulling image {image}")
+            docker_client.images.pull(image)
+
+    with ThreadPoolExecutor(max_workers=max(len(images), 1)) as executor:
+        list(executor.map(pull_if_missing, images))
+
+
+def remove_images(docker_client, *image_ids):
+    for image_id in image_ids:
+        try:
+            docker_client.images.remove(image_id, force=True)
         except ImageNotFound:
             pass
 
@@ -252,34 +498,79 @@ def run_game(server_image: str, clients, server_args=tuple(), client_args=tuple(
     :param server_args: List of positional arguments to be passed to the game server in the CLI.
     :param client_args: List of positional arguments to be passed to each client in the CLI.
     """
-    docker_client = docker.from_env()
-    game_secret = secrets.token_urlsafe(8).lower()
-    network: Network = create_network(docker_client, game_secret)
-    network_name = network.name
+    docker_client = get_docker_client()
 
-    log("Starting server...")
-    server_container, server_image = start_server(
-        docker_client, network_name, server_image, game_secret, server_args=server_args
+    # Pull before creating anything for the game, so a bad image fails the game without leaving anything behind
+    pull_missing_images(
+        docker_client, *({server_image} | {client["image"] for client in clients})
     )
-    log(f"Server started: {server_container.short_id}")
 
-    client_containers = []
-    client_images = []
-    for i, client in enumerate(clients):
-        log(f"Starting client {client['name']}")
+    # Already lowercase, so it can be used in image tags and names as it is
+    game_secret = secrets.token_hex(8)
+    network: Network = create_network(docker_client, game_secret)
+    network_name = network.name
+
+    logs_folder = os.path.join(os.getcwd(), "container_logs")
+    ensure_empty_folder_exists(logs_folder)
+    # Clear the last game's replay right away, so it isn't mistaken for this game's
+    live_replay_folder = os.path.join(os.getcwd(), "live_replay_files")
+    ensure_empty_folder_exists(live_replay_folder)
 
-        client_container, client_image = start_client(
+    # Image builds are independent of each other, so let the Docker daemon run them in parallel
+    with ThreadPoolExecutor(max_workers=len(clients) + 1) as executor:
+        log("Starting server...")
+        server_future = executor.submit(
+            start_server,
             docker_client,
             network_name,
-            i,
-            client,
+            server_image,
             game_secret,
-            client_args=client_args,
+            server_args=server_args,
         )
 
-        client_containers.append(client_container)
-        client_images.append(client_image)
-        log(f"Client started: {client_containers[-1].short_id}")
+        # Clients with the same image share the same image build
+        client_image_futures = {}
+        for client in clients:
+            if client["image"] not in client_image_futures:
+                client_image_futures[client["image"]] = executor.submit(
+                    build_client_image,
+                    docker_client,
+                    client["image"],
+                    game_secret,
+                    client_args=client_args,
+                )
+
+        server_container, server_image_id = server_future.result()
+        server_log_thread = start_writing_logs(logs_folder, server_container)
+        log(f"Server started: {server_container.short_id}")
+
+        client_images = {
+            image: future.result() for image, future in client_image_futures.items()
+        }
+
+        # The client sidecar connects to the server as soon as it starts, so the server must be up first
+        client_futures = []
+        for i, client in enumerate(clients):
+            log(f"Starting client {client['name']}")
+            client_futures.append(
+                executor.submit(
+                    start_client,
+                    docker_client,
+                    network_name,
+                    i,
+                    client,
+                    client_images[client["image"]][0],
+                    game_secret,
+                )
+            )
+
+        client_containers_and_log_threads = []
+        for client_future in client_futures:
+            client_container = client_future.result()
+            client_containers_and_log_threads.append(
+                (client_container, start_writing_logs(logs_folder, client_container))
+            )
+            log(f"Client started: {client_container.short_id}")
 
     log("All clients started.")
     try:
@@ -288,15 +579,23 @@ def run_game(server_image: str, clients, server_args=tuple(), client_args=tuple(
         log("Game server crashed! Please check the logs.")
         log(e)
     else:
-        server_container.reload()
-        while server_container.status == "running":
-            time.sleep(config.check_game_has_finished_interval)
-            server_container.reload()
+        # Blocks on the daemon until the server exits instead of polling its status
+        server_container.wait()
 
-    write_logs_and_remove_containers(
-        "container_logs", server_container, *client_containers
+    try:
+        copy_live_replay_files(server_container, live_replay_folder)
+    except (APIError, tarfile.TarError, OSError) as e:
+        log("Failed to copy the live replay files from the server container")
+        log(repr(e))
+
+    stop_and_remove_containers(
+        (server_container, server_log_thread), *client_containers_and_log_threads
+    )
+    remove_images(
+        docker_client,
+        server_image_id,
+        *[client_image_id for _, client_image_id in client_images.values()],
     )
-    remove_images(docker_client, server_image, *client_images)
     network.remove()
     log("The game has finished!")
 